@@ -0,0 +1,170 @@
+"""
+Ładowanie konfiguracji z walidacją, cache skompilowanej postaci i jednoprzebiegową
+podmianą zmiennych środowiskowych ${VAR}
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Any, Tuple, Optional
+
+
+CACHE_VERSION = 3
+ENV_PREFIX = 'MONGODB_'
+PLACEHOLDER_PATTERN = re.compile(r'\$\{([A-Za-z_][A-Za-z0-9_]*)\}')
+
+REQUIRED_DATABASE_KEYS = ('host', 'port', 'username', 'password', 'db_name')
+REQUIRED_FEED_KEYS = ('url_template', 'kolekcja_mongo', 'int_cols', 'float_cols', 'date_cols')
+
+
+def normalize_column_name(name: str) -> str:
+    """Normalizuje nazwę kolumny tak jak zapisywana jest w bazie (bez spacji i znaków diakrytycznych)."""
+    from unidecode import unidecode
+    return unidecode(name.replace(" ", "_"))
+
+
+def compile_feed(name: str, feed: Dict[str, Any]) -> Dict[str, Any]:
+    """Waliduje definicję pliku i uzupełnia wartości domyślne."""
+    missing = [key for key in REQUIRED_FEED_KEYS if key not in feed]
+    if missing:
+        raise ValueError(f"Brak kluczy {missing} w definicji pliku '{name}'")
+
+    codec = feed.get('storage_codec')
+    if codec is not None:
+        from database.dane_codec import CODEC_NAME
+        if codec != CODEC_NAME:
+            raise ValueError(f"Nieznany kodek zapisu '{codec}' w definicji pliku '{name}' "
+                             f"(dostępny: '{CODEC_NAME}')")
+
+    compiled = dict(feed)
+    compiled.setdefault('fields_to_utc', [])
+    compiled.setdefault('fields_to_add_hour', {})
+    compiled.setdefault('date_format', '%Y%m%d')
+
+    # Znormalizowane nazwy kolumn liczone raz - przy starcie z cache nie trzeba importować unidecode
+    columns = ['Data', 'Godzina'] + compiled['int_cols'] + compiled['float_cols'] + compiled['date_cols']
+    compiled['column_names'] = {column: normalize_column_name(column) for column in columns}
+    return compiled
+
+
+def compile_config(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Waliduje konfigurację i zwraca postać skompilowaną z listą miejsc do podmiany zmiennych."""
+    if 'database' not in raw or 'pobierz' not in raw:
+        raise ValueError("Konfiguracja musi zawierać sekcje 'database' i 'pobierz'")
+
+    missing = [key for key in REQUIRED_DATABASE_KEYS if key not in raw['database']]
+    if missing:
+        raise ValueError(f"Brak kluczy {missing} w sekcji 'database'")
+
+    config = dict(raw)
+    config['pobierz'] = {name: compile_feed(name, feed) for name, feed in raw['pobierz'].items()}
+
+    return {
+        'config': config,
+        'placeholders': list(_find_placeholders(config)),
+    }
+
+
+def _find_placeholders(node: Any, path: Tuple = ()):
+    """Zwraca ścieżki (listy kluczy) do wartości tekstowych zawierających ${VAR}."""
+    if isinstance(node, dict):
+        for key, value in node.items():
+            yield from _find_placeholders(value, path + (key,))
+    elif isinstance(node, list):
+        for index, value in enumerate(node):
+            yield from _find_placeholders(value, path + (index,))
+    elif isinstance(node, str) and PLACEHOLDER_PATTERN.search(node):
+        yield [list(path), node]
+
+
+def expand_env(compiled: Dict[str, Any], environ: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Podmienia ${MONGODB_*} w jednym przebiegu tylko w miejscach wskazanych przy kompilacji."""
+    environ = os.environ if environ is None else environ
+    config = compiled['config']
+
+    def replace(match):
+        key = match.group(1)
+        if key.startswith(ENV_PREFIX) and key in environ:
+            return environ[key]
+        return match.group(0)
+
+    for path, template in compiled['placeholders']:
+        target = config
+        for key in path[:-1]:
+            target = target[key]
+        target[path[-1]] = PLACEHOLDER_PATTERN.sub(replace, template)
+    return config
+
+
+def _cache_path(config_path: str) -> str:
+    abs_path = os.path.abspath(config_path)
+    digest = hashlib.sha1(abs_path.encode('utf-8')).hexdigest()[:12]
+    base = os.path.basename(abs_path)
+    return os.path.join(os.path.dirname(abs_path), '__pycache__', f"{base}.{digest}.compiled.json")
+
+
+def is_cacheable(raw: Dict[str, Any]) -> bool:
+    """Cache jest dozwolony tylko gdy dane dostępowe sekcji 'database' pochodzą z ${VAR}.
+
+    Konfiguracje z jawnymi danymi dostępowymi (np. config.local.json) nie są kopiowane na dysk;
+    pozostałe ustawienia sekcji (np. 'cache') nie mają na to wpływu.
+    """
+    database = raw.get('database', {})
+    return all(
+        isinstance(database.get(key), str) and PLACEHOLDER_PATTERN.fullmatch(database[key].strip())
+        for key in REQUIRED_DATABASE_KEYS
+    )
+
+
+def load_compiled(config_path: str) -> Dict[str, Any]:
+    """Zwraca skompilowaną konfigurację z cache lub kompiluje ją i zapisuje w __pycache__.
+
+    Cache (JSON) zawiera wyłącznie szablon przed podmianą zmiennych i jest zapisywany
+    tylko dla konfiguracji, których dane dostępowe pochodzą z ${MONGODB_*}.
+    """
+    stat = os.stat(config_path)
+    cache_key = [CACHE_VERSION, stat.st_mtime_ns, stat.st_size]
+    cache_path = _cache_path(config_path)
+
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached.get('key') == cache_key:
+            return cached['compiled']
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    with open(config_path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    compiled = compile_config(raw)
+
+    # Usuń cache zapisany przez wcześniejsze wersje (pickle, także z jawnymi danymi dostępowymi)
+    stale_paths = [cache_path[:-len('.json')]]
+    if not is_cacheable(raw):
+        stale_paths.append(cache_path)
+    for stale_path in stale_paths:
+        try:
+            os.remove(stale_path)
+        except OSError:
+            pass
+
+    if not is_cacheable(raw):
+        return compiled
+
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'key': cache_key, 'compiled': compiled}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Cache jest tylko optymalizacją - brak uprawnień do zapisu nie jest błędem
+        pass
+
+    return compiled
+
+
+def load_config(config_path: str) -> Dict[str, Any]:
+    """Ładuje zwalidowaną konfigurację z podmienionymi zmiennymi środowiskowymi."""
+    return expand_env(load_compiled(config_path))
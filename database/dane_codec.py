@@ -0,0 +1,145 @@
+"""
+Kodek kolumnowy dla pola `dane` - każda kolumna jako spakowany little-endian float64
+(BSON Binary) plus wspólny wektor znaczników czasu zamiast powtarzania nazw pól w każdym wierszu
+"""
+
+import datetime
+import sys
+from array import array
+from typing import Dict, Any, List
+from bson.binary import Binary
+
+
+CODEC_NAME = 'f64le'
+CODEC_VERSION = 1
+SUPPORTED_VERSIONS = (1,)
+
+# Brak wartości: NaN dla kolumn liczbowych, INT64_MIN dla znaczników czasu
+NULL_TIMESTAMP = -2 ** 63
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_EPOCH_UTC = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+_BIG_ENDIAN = sys.byteorder == 'big'
+
+
+def _pack(typecode: str, values: List) -> Binary:
+    packed = array(typecode, values)
+    if _BIG_ENDIAN:
+        packed.byteswap()
+    return Binary(packed.tobytes())
+
+
+def _unpack(typecode: str, data: bytes) -> List:
+    unpacked = array(typecode)
+    unpacked.frombytes(data)
+    if _BIG_ENDIAN:
+        unpacked.byteswap()
+    return unpacked.tolist()
+
+
+def _to_millis(value: datetime.datetime) -> int:
+    """Milisekundy od epoki; daty bez strefy traktowane jak UTC (tak jak w BSON)."""
+    if value.tzinfo is None:
+        delta = value - _EPOCH
+    else:
+        delta = value - _EPOCH_UTC
+    return (delta.days * 86400 + delta.seconds) * 1000 + delta.microseconds // 1000
+
+
+def _column_kind(values: List) -> str:
+    kinds = set()
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, datetime.datetime):
+            kinds.add('ts')
+        elif isinstance(value, bool) or not isinstance(value, (int, float)):
+            return 'obj'
+        elif isinstance(value, int):
+            kinds.add('int')
+        else:
+            kinds.add('f64')
+    if kinds == {'ts'}:
+        return 'ts'
+    if kinds and kinds <= {'int', 'f64'}:
+        return 'int' if kinds == {'int'} else 'f64'
+    return 'obj' if kinds else 'f64'
+
+
+def is_packed(dane: Any) -> bool:
+    """Sprawdza czy wartość pola `dane` jest zakodowana kodekiem kolumnowym."""
+    return isinstance(dane, dict) and dane.get('_codec') == CODEC_NAME
+
+
+def encode_dane(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Koduje listę wierszy do postaci kolumnowej."""
+    keys: List[str] = []
+    for row in rows:
+        for key in row:
+            if key not in keys:
+                keys.append(key)
+
+    packed = {'_codec': CODEC_NAME, '_v': CODEC_VERSION, 'n': len(rows), 'keys': keys,
+              'ts': {}, 'f64': {}, 'int': [], 'obj': {}}
+    nan = float('nan')
+
+    for key in keys:
+        values = [row.get(key) for row in rows]
+        kind = _column_kind(values)
+        if kind == 'ts':
+            packed['ts'][key] = _pack('q', [NULL_TIMESTAMP if value is None else _to_millis(value)
+                                            for value in values])
+        elif kind in ('f64', 'int'):
+            packed['f64'][key] = _pack('d', [nan if value is None else float(value) for value in values])
+            if kind == 'int':
+                packed['int'].append(key)
+        else:
+            packed['obj'][key] = values
+
+    return packed
+
+
+def _check_version(packed: Dict[str, Any]):
+    if packed.get('_v') not in SUPPORTED_VERSIONS:
+        raise ValueError(f"Nieobsługiwana wersja kodeka {CODEC_NAME}: {packed.get('_v')}")
+
+
+def decode_dane(packed: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Dekoduje postać kolumnową do listy wierszy (jak przed kodowaniem; NaN -> None)."""
+    _check_version(packed)
+    n = packed['n']
+    int_columns = set(packed.get('int', []))
+    columns: Dict[str, List] = {}
+
+    for key, data in packed.get('ts', {}).items():
+        columns[key] = [None if millis == NULL_TIMESTAMP
+                        else _EPOCH + datetime.timedelta(milliseconds=millis)
+                        for millis in _unpack('q', data)]
+    for key, data in packed.get('f64', {}).items():
+        cast = int if key in int_columns else float
+        columns[key] = [None if value != value else cast(value) for value in _unpack('d', data)]
+    for key, values in packed.get('obj', {}).items():
+        columns[key] = values
+
+    keys = packed['keys']
+    column_values = [columns.get(key, [None] * n) for key in keys]
+    return [dict(zip(keys, row_values)) for row_values in zip(*column_values)]
+
+
+def decode_dane_arrays(packed: Dict[str, Any]) -> Dict[str, Any]:
+    """Zwraca kolumny jako widoki NumPy bez kopiowania (tylko do odczytu).
+
+    Kolumny liczbowe to float64 (braki jako NaN), znaczniki czasu to datetime64[ms]
+    (braki jako NaT), pozostałe kolumny zwracane są jako listy.
+    """
+    import numpy as np
+
+    _check_version(packed)
+    arrays: Dict[str, Any] = {}
+    for key, data in packed.get('ts', {}).items():
+        arrays[key] = np.frombuffer(data, dtype='<i8').view('datetime64[ms]')
+    for key, data in packed.get('f64', {}).items():
+        arrays[key] = np.frombuffer(data, dtype='<f8')
+    for key, values in packed.get('obj', {}).items():
+        arrays[key] = values
+    return arrays
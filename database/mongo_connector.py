@@ -2,18 +2,178 @@
 Zoptymalizowany łącznik MongoDB z connection pooling i lepszą obsługą błędów
 """
 
+import copy
 import datetime
-from typing import Dict, Any, Optional, List
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+import bson
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError, OperationFailure
 
+from database.dane_codec import is_packed, decode_dane, decode_dane_arrays
+
+
+_MISSING = object()
+
+
+class ReadThroughCache:
+    """Cache odczytów w pamięci procesu (LRU + TTL + limit bajtów).
+
+    Klucz to (kolekcja, filtr, projekcja). Przechowywane są głębokie kopie
+    wyników, więc modyfikacja zwróconych dokumentów nie psuje cache.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0,
+                 max_bytes: int = 16 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+
+        # klucz -> (czas_wygaśnięcia, rozmiar_w_bajtach, wartość)
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        # Licznik unieważnień per kolekcja (+ wspólny dla clear) - wynik zapytania rozpoczętego
+        # przed zapisem nie może trafić do cache po unieważnieniu
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(collection_name: str, filtr: Dict[str, Any],
+                 projection_fields: Optional[Dict[str, Any]] = None,
+                 kind: str = 'one') -> Tuple:
+        """Buduje stabilny klucz cache niezależny od kolejności pól filtra.
+
+        Sortowane są tylko klucze najwyższego poziomu - w zagnieżdżonych dokumentach
+        kolejność pól ma znaczenie dla MongoDB ({'a': {'x': 1, 'y': 2}} != {'a': {'y': 2, 'x': 1}}).
+        """
+        def dumps(value: Any) -> str:
+            if isinstance(value, dict):
+                value = [[key, value[key]] for key in sorted(value)]
+            return json.dumps(value, default=repr)
+
+        return (collection_name, kind, dumps(filtr), dumps(projection_fields))
+
+    @staticmethod
+    def estimate_size(value: Any) -> int:
+        """Szacuje rozmiar wyniku w bajtach na podstawie kodowania BSON."""
+        if value is None:
+            return 0
+        try:
+            if isinstance(value, list):
+                return sum(len(bson.encode(doc)) for doc in value)
+            return len(bson.encode(value))
+        except Exception:
+            return len(repr(value))
+
+    def generation(self, collection_name: str) -> int:
+        """Zwraca bieżącą generację kolekcji; odczytywana przed zapytaniem do bazy."""
+        with self._lock:
+            return self._epoch + self._generations.get(collection_name, 0)
+
+    def get(self, key: Tuple) -> Any:
+        """Zwraca kopię wartości z cache albo _MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return copy.deepcopy(value)
+
+    def put(self, key: Tuple, value: Any, generation: Optional[int] = None):
+        """Zapisuje wartość w cache z poszanowaniem limitów.
+
+        Gdy podano `generation`, wartość jest pomijana jeśli kolekcja została
+        w międzyczasie unieważniona (wynik mógł być odczytany przed zapisem).
+        """
+        size = self.estimate_size(value)
+        if size > self.max_bytes:
+            return
+
+        value = copy.deepcopy(value)
+        with self._lock:
+            if (generation is not None
+                    and generation != self._epoch + self._generations.get(key[0], 0)):
+                return
+
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate_collection(self, collection_name: str):
+        """Usuwa z cache wszystkie wpisy dotyczące danej kolekcji."""
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            stale = [key for key in self._entries if key[0] == collection_name]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        """Czyści cały cache."""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Zwraca statystyki cache do doboru rozmiaru."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+            }
+
 
 class OptimizedMongoConnector:
     """Zoptymalizowany łącznik MongoDB z connection pooling."""
 
     def __init__(self, host: str = 'localhost', port: int = 27017, 
                  username: Optional[str] = None, password: Optional[str] = None, 
-                 db_name: Optional[str] = None):
+                 db_name: Optional[str] = None, cache_enabled: bool = False,
+                 cache_max_entries: int = 256, cache_ttl_seconds: float = 300.0,
+                 cache_max_bytes: int = 16 * 1024 * 1024, dane_decode: str = 'rows'):
         self.host = host
         self.port = port
         self.username = username
@@ -24,6 +184,17 @@ class OptimizedMongoConnector:
         self.db = None
         self._connection_string = self._build_connection_string()
 
+        # Opcjonalny cache odczytów (read-through), unieważniany przez zapisy
+        self.cache = ReadThroughCache(
+            max_entries=cache_max_entries,
+            ttl_seconds=cache_ttl_seconds,
+            max_bytes=cache_max_bytes
+        ) if cache_enabled else None
+
+        # Sposób dekodowania spakowanego pola `dane`: 'rows' (lista słowników),
+        # 'numpy' (widoki kolumn bez kopiowania) lub 'raw' (bez dekodowania)
+        self.dane_decode = dane_decode
+
     def _build_connection_string(self) -> str:
         """Buduje connection string dla MongoDB."""
         if self.username and self.password:
@@ -87,6 +258,7 @@ class OptimizedMongoConnector:
             
             collection = self.db[collection_name]
             result = collection.insert_one(document)
+            self._invalidate_cache(collection_name)
             print(f"✅ Wstawiono dokument z ID: {result.inserted_id}")
             return True
             
@@ -97,14 +269,48 @@ class OptimizedMongoConnector:
             print(f"❌ Nieoczekiwany błąd podczas wstawiania: {e}")
             return False
 
+    def _invalidate_cache(self, collection_name: str):
+        """Unieważnia wpisy cache dla kolekcji po zapisie."""
+        if self.cache is not None:
+            self.cache.invalidate_collection(collection_name)
+
+    def _decode_document(self, document: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Dekoduje spakowane pole `dane` zgodnie z ustawieniem dane_decode."""
+        if document is None or self.dane_decode == 'raw' or not is_packed(document.get('dane')):
+            return document
+
+        if self.dane_decode == 'numpy':
+            document['dane'] = decode_dane_arrays(document['dane'])
+        else:
+            document['dane'] = decode_dane(document['dane'])
+        return document
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Zwraca statystyki cache (trafienia/chybienia) lub None gdy wyłączony."""
+        return self.cache.stats() if self.cache is not None else None
+
     def find_document(self, collection_name: str, filtr: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Znajduje dokument w kolekcji."""
         try:
+            cache_key = None
+            if self.cache is not None:
+                # Trafienie w cache omija także ping z ensure_connection
+                cache_key = ReadThroughCache.make_key(collection_name, filtr)
+                cached = self.cache.get(cache_key)
+                if cached is not _MISSING:
+                    return self._decode_document(cached)
+                generation = self.cache.generation(collection_name)
+
             if not self.ensure_connection():
                 return None
             
             collection = self.db[collection_name]
-            return collection.find_one(filtr)
+            document = collection.find_one(filtr)
+
+            # Cache trzyma postać zakodowaną (mniejszą), dekodowanie przy każdym odczycie
+            if cache_key is not None:
+                self.cache.put(cache_key, document, generation)
+            return self._decode_document(document)
             
         except OperationFailure as e:
             print(f"❌ Błąd operacji MongoDB: {e}")
@@ -117,12 +323,25 @@ class OptimizedMongoConnector:
                       projection_fields: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """Znajduje dokumenty w kolekcji."""
         try:
+            cache_key = None
+            if self.cache is not None:
+                cache_key = ReadThroughCache.make_key(
+                    collection_name, filtr, projection_fields, kind='many')
+                cached = self.cache.get(cache_key)
+                if cached is not _MISSING:
+                    return [self._decode_document(document) for document in cached]
+                generation = self.cache.generation(collection_name)
+
             if not self.ensure_connection():
                 return []
             
             collection = self.db[collection_name]
             cursor = collection.find(filtr, projection_fields)
-            return list(cursor)
+            documents = list(cursor)
+
+            if cache_key is not None:
+                self.cache.put(cache_key, documents, generation)
+            return [self._decode_document(document) for document in documents]
             
         except OperationFailure as e:
             print(f"❌ Błąd operacji MongoDB: {e}")
@@ -140,6 +359,7 @@ class OptimizedMongoConnector:
             
             collection = self.db[collection_name]
             result = collection.update_one(filtr, nowe_dane)
+            self._invalidate_cache(collection_name)
             
             if result.matched_count > 0:
                 print(f"✅ Zaktualizowano {result.modified_count} dokumentów")
@@ -166,6 +386,7 @@ class OptimizedMongoConnector:
             filtr = {"data_cet": {"$lt": cutoff_date}}
             
             result = collection.delete_many(filtr)
+            self._invalidate_cache(collection_name)
             print(f"🗑️  Usunięto {result.deleted_count} starych dokumentów")
             return True
             
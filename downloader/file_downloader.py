@@ -20,8 +20,10 @@ class OptimizedFileDownloader:
     MAX_RETRIES = 18           # Maksymalnie 18 prób (do 14:30)
     TIMEOUT = 60               # 60 sekund timeout
 
-    def __init__(self, url_template: str, data_start: str, data_end: Optional[str] = None):
+    def __init__(self, url_template: str, data_start: str, data_end: Optional[str] = None,
+                 max_retries: Optional[int] = None):
         self.url_template = url_template
+        self.max_retries = max_retries or self.MAX_RETRIES
         self.data_start = self.format_date_for_url(data_start)
         self.data_start_dashed = self.format_date_dashed(data_start)
         self.data_end = self.format_date_for_url(data_end) if data_end else None
@@ -93,6 +95,15 @@ class OptimizedFileDownloader:
         else:
             return self.MAX_RETRY_DELAY  # Ostatnie próby co 30 minut
 
+    def wait_before_retry(self, attempt: int) -> int:
+        """Czeka przed kolejną próbą zgodnie z harmonogramem retry i zwraca opóźnienie."""
+        delay = self.calculate_retry_delay(attempt)
+        next_attempt = datetime.now() + timedelta(seconds=delay)
+        print(f"⏳ Czekam {delay/60:.1f} minut przed kolejną próbą...")
+        print(f"🕐 Następna próba o: {next_attempt.strftime('%H:%M:%S')}")
+        time.sleep(delay)
+        return delay
+
     def download(self) -> Optional[bytes]:
         """Pobiera plik z określonego URL z inteligentnym retry."""
         retries = 0
@@ -102,9 +113,9 @@ class OptimizedFileDownloader:
         print(f"⏰ Czas rozpoczęcia: {start_time.strftime('%H:%M:%S')}")
         print(f"🔍 DEBUG: data_start={self.data_start}, data_end={self.data_end}")
         
-        while retries < self.MAX_RETRIES:
+        while retries < self.max_retries:
             try:
-                print(f"📥 Próba {retries + 1}/{self.MAX_RETRIES}: {self.url}")
+                print(f"📥 Próba {retries + 1}/{self.max_retries}: {self.url}")
                 
                 response = requests.get(
                     self.url,
@@ -135,24 +146,20 @@ class OptimizedFileDownloader:
                         print(f"❌ Nieprawidłowa odpowiedź serwera")
                     
             except Timeout:
-                print(f"⏰ Timeout podczas pobierania (próba {retries + 1}/{self.MAX_RETRIES})")
+                print(f"⏰ Timeout podczas pobierania (próba {retries + 1}/{self.max_retries})")
             except ConnectionError as e:
-                print(f"🔌 Błąd połączenia (próba {retries + 1}/{self.MAX_RETRIES}): {e}")
+                print(f"🔌 Błąd połączenia (próba {retries + 1}/{self.max_retries}): {e}")
             except RequestException as e:
-                print(f"❌ Błąd żądania (próba {retries + 1}/{self.MAX_RETRIES}): {e}")
+                print(f"❌ Błąd żądania (próba {retries + 1}/{self.max_retries}): {e}")
             except Exception as e:
-                print(f"❌ Nieoczekiwany błąd (próba {retries + 1}/{self.MAX_RETRIES}): {e}")
+                print(f"❌ Nieoczekiwany błąd (próba {retries + 1}/{self.max_retries}): {e}")
             
             retries += 1
-            if retries < self.MAX_RETRIES:
-                delay = self.calculate_retry_delay(retries)
-                next_attempt = datetime.now() + timedelta(seconds=delay)
-                print(f"⏳ Czekam {delay/60:.1f} minut przed kolejną próbą...")
-                print(f"🕐 Następna próba o: {next_attempt.strftime('%H:%M:%S')}")
-                time.sleep(delay)
+            if retries < self.max_retries:
+                self.wait_before_retry(retries)
         
         elapsed_time = datetime.now() - start_time
-        print(f"❌ Przekroczono maksymalną liczbę prób ({self.MAX_RETRIES})")
+        print(f"❌ Przekroczono maksymalną liczbę prób ({self.max_retries})")
         print(f"⏱️  Całkowity czas oczekiwania: {elapsed_time.total_seconds()/3600:.1f} godzin")
         print(f"💡 Plik może być dostępny później - sprawdź ręcznie lub uruchom ponownie")
         return None 
\ No newline at end of file
@@ -0,0 +1,3 @@
+"""
+Narzędzia do testów obciążeniowych: lokalny serwer udający PSE i harness end-to-end
+"""
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Harness end-to-end: uruchamia main.py lub OptimizedFileDownloader przeciwko lokalnemu
+serwerowi PSE ze skompresowanym zegarem i raportuje percentyle latencji i przepustowości
+
+Przykład:
+    python -m loadtest.harness --dates 2000 --concurrency 32 --speedup 1200
+    python -m loadtest.harness --mode main --dates 50 --truncate-rate 0.1
+"""
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from loadtest.pse_stub_server import CompressedClock, PseStubServer, day_intervals  # noqa: E402
+
+
+class InMemoryMongoConnector:
+    """Łącznik zgodny z OptimizedMongoConnector trzymający dane w pamięci."""
+
+    _store: Dict[str, List[Dict[str, Any]]] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def connect(self) -> bool:
+        return True
+
+    def disconnect(self):
+        pass
+
+    def ensure_connection(self) -> bool:
+        return True
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        return None
+
+    @staticmethod
+    def _matches(document: Dict[str, Any], filtr: Dict[str, Any]) -> bool:
+        return all(document.get(key) == value for key, value in filtr.items())
+
+    def insert_document(self, collection_name: str, document: Dict[str, Any]) -> bool:
+        with self._lock:
+            self._store.setdefault(collection_name, []).append(dict(document))
+        return True
+
+    def find_document(self, collection_name: str, filtr: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for document in self._store.get(collection_name, []):
+                if self._matches(document, filtr):
+                    return dict(document)
+        return None
+
+    def find_documents(self, collection_name: str, filtr: Dict[str, Any],
+                       projection_fields: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(document) for document in self._store.get(collection_name, [])
+                    if self._matches(document, filtr)]
+
+    def update_document(self, collection_name: str, filtr: Dict[str, Any],
+                        nowe_dane: Dict[str, Any]) -> bool:
+        with self._lock:
+            for document in self._store.get(collection_name, []):
+                if self._matches(document, filtr):
+                    document.update(nowe_dane.get('$set', {}))
+                    return True
+        return False
+
+
+class _ClockTimeModule:
+    """Zamiennik modułu `time` dla downloadera - sleep według zegara wirtualnego."""
+
+    def __init__(self, clock: CompressedClock):
+        self._clock = clock
+
+    def sleep(self, seconds: float):
+        self._clock.sleep(seconds)
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Percentyl metodą najbliższej rangi."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100.0 * len(ordered) + 0.5 - 1e-9)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """Zwraca zestaw percentyli dla listy wartości."""
+    return {
+        'p50': percentile(values, 50),
+        'p90': percentile(values, 90),
+        'p95': percentile(values, 95),
+        'p99': percentile(values, 99),
+        'max': max(values) if values else None,
+    }
+
+
+IMPORT_TIME_MODULES = ['main', 'config_loader', 'processor.data_processor',
+                       'downloader.file_downloader', 'requests', 'pymongo', 'unidecode']
+
+
+def measure_import_times(modules: List[str] = IMPORT_TIME_MODULES) -> Dict[str, Optional[float]]:
+    """Mierzy skumulowany czas importu modułów (ms) w świeżym interpreterze (-X importtime)."""
+    repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = {}
+    for module in modules:
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=repo_root, capture_output=True, text=True
+        )
+        results[module] = None
+        if completed.returncode != 0:
+            continue
+        for line in completed.stderr.splitlines():
+            parts = line.split('|')
+            if len(parts) == 3 and parts[2].strip() == module:
+                results[module] = int(parts[1]) / 1000.0
+
+    # Czas startu całego procesu do momentu gotowości CLI
+    repo_main = os.path.join(repo_root, 'main.py')
+    started = time.perf_counter()
+    subprocess.run([sys.executable, repo_main, '--help'], cwd=repo_root, capture_output=True)
+    results['main.py --help (proces)'] = (time.perf_counter() - started) * 1000.0
+    return results
+
+
+def build_publish_times(dates: List[str], clock_start: datetime.datetime,
+                        window: str, seed: int) -> Dict[str, datetime.datetime]:
+    """Losuje czasy publikacji (czas wirtualny) w oknie 'HH:MM-HH:MM'."""
+    start_str, end_str = window.split('-')
+    day = clock_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    window_start = day + datetime.timedelta(hours=int(start_str[:2]), minutes=int(start_str[3:5]))
+    window_end = day + datetime.timedelta(hours=int(end_str[:2]), minutes=int(end_str[3:5]))
+    span = (window_end - window_start).total_seconds()
+
+    rng = random.Random(seed)
+    return {date_str: window_start + datetime.timedelta(seconds=rng.uniform(0, span))
+            for date_str in dates}
+
+
+def load_harness_config(url_template: str) -> Dict[str, Any]:
+    """Wczytuje config.json i podmienia url_template na adres lokalnego serwera."""
+    from config_loader import load_config
+
+    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'config.json')
+    config = load_config(config_path)
+    for file_config in config['pobierz'].values():
+        file_config['url_template'] = url_template
+    return config
+
+
+def verify_stored_day(config: Dict[str, Any], date_str: str, interval_minutes: int) -> bool:
+    """Sprawdza zapisaną dobę: liczbę wierszy i to, że wszystkie kolumny float są sparsowane."""
+    from database.dane_codec import is_packed, decode_dane
+    from processor.data_processor import to_utc
+
+    file_config = config['pobierz']['file_2']
+    data_cet = to_utc(datetime.datetime.strptime(date_str, '%Y%m%d'))
+    document = InMemoryMongoConnector().find_document(file_config['kolekcja_mongo'], {'dataCet': data_cet})
+    if document is None:
+        print(f"❌ {date_str}: brak zapisanego dokumentu", file=sys.__stderr__)
+        return False
+
+    dane = decode_dane(document['dane']) if is_packed(document['dane']) else document['dane']
+    expected_rows = len(day_intervals(date_str, interval_minutes))
+    if len(dane) != expected_rows:
+        print(f"❌ {date_str}: zapisano {len(dane)} wierszy zamiast {expected_rows}", file=sys.__stderr__)
+        return False
+
+    column_names = file_config['column_names']
+    for column in file_config['float_cols']:
+        key = column_names[column]
+        if any(key not in row or not (row[key] is None or isinstance(row[key], float)) for row in dane):
+            print(f"❌ {date_str}: kolumna {key} nie została sparsowana", file=sys.__stderr__)
+            return False
+    return True
+
+
+def run_scenario(mode: str, date_str: str, url_template: str, config: Dict[str, Any],
+                 interval_minutes: int) -> bool:
+    """Przeprowadza jeden przebieg (jedna data) i zwraca czy dane zostały pozyskane."""
+    date_dashed = datetime.datetime.strptime(date_str, '%Y%m%d').strftime('%Y-%m-%d')
+    if mode == 'downloader':
+        from downloader.file_downloader import OptimizedFileDownloader
+        downloader = OptimizedFileDownloader(url_template, date_dashed)
+        return downloader.download() is not None
+
+    import main
+    if main.main(['--date', date_dashed]) != 0:
+        return False
+    return verify_stored_day(config, date_str, interval_minutes)
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Uruchamia serwer, przebiegi równoległe i zbiera metryki."""
+    clock_start = datetime.datetime.strptime(
+        f"{args.start_date} {args.clock_start}", '%Y-%m-%d %H:%M') - datetime.timedelta(days=1)
+    first_date = datetime.datetime.strptime(args.start_date, '%Y-%m-%d')
+    dates = [(first_date + datetime.timedelta(days=i)).strftime('%Y%m%d')
+             for i in range(args.dates)]
+
+    clock = CompressedClock(clock_start, speedup=args.speedup)
+    publish_times = build_publish_times(dates, clock_start, args.publish_window, args.seed)
+    server = PseStubServer(
+        clock,
+        publish_times=publish_times,
+        interval_minutes=args.interval_minutes,
+        latency_ms=(args.latency_ms_min, args.latency_ms_max),
+        timeout_rate=args.timeout_rate,
+        hang_seconds=args.client_timeout * 1.5,
+        truncate_rate=args.truncate_rate,
+        truncate_mode=args.truncate_mode,
+        seed=args.seed
+    ).start()
+
+    import main
+    from downloader import file_downloader
+    from database import mongo_connector
+
+    config = load_harness_config(server.url_template)
+    results = []
+    results_lock = threading.Lock()
+
+    def worker(date_str: str):
+        real_start = time.monotonic()
+        virtual_start = clock.now()
+        try:
+            ok = run_scenario(args.mode, date_str, server.url_template, config,
+                              args.interval_minutes)
+        except Exception as e:
+            print(f"❌ Błąd przebiegu {date_str}: {e}", file=sys.__stderr__)
+            ok = False
+        virtual_end = clock.now()
+        with results_lock:
+            results.append({
+                'date': date_str,
+                'ok': ok,
+                'real_seconds': time.monotonic() - real_start,
+                'real_end': time.monotonic(),
+                'virtual_minutes': (virtual_end - virtual_start).total_seconds() / 60,
+                'after_publish_minutes': (virtual_end - publish_times[date_str]).total_seconds() / 60,
+            })
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    patches = [
+        mock.patch.object(file_downloader, 'time', _ClockTimeModule(clock)),
+        mock.patch.object(file_downloader.OptimizedFileDownloader, 'TIMEOUT', args.client_timeout),
+        mock.patch.object(mongo_connector, 'OptimizedMongoConnector', InMemoryMongoConnector),
+        mock.patch.object(main, 'load_config', lambda *a, **k: config),
+    ]
+
+    run_start = time.monotonic()
+    try:
+        with contextlib.ExitStack() as stack:
+            for patch in patches:
+                stack.enter_context(patch)
+            stack.enter_context(output)
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                list(pool.map(worker, dates))
+    finally:
+        server.stop()
+    wall_seconds = time.monotonic() - run_start
+
+    succeeded = [r for r in results if r['ok']]
+    # Przepustowość w oknach 1 s czasu rzeczywistego
+    buckets: Dict[int, int] = {}
+    for r in succeeded:
+        bucket = int(r['real_end'] - run_start)
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+    per_second = [float(buckets.get(i, 0)) for i in range(int(wall_seconds) + 1)]
+
+    return {
+        'mode': args.mode,
+        'dates': len(dates),
+        'succeeded': len(succeeded),
+        'failed': len(results) - len(succeeded),
+        'wall_seconds': wall_seconds,
+        'throughput_per_second': len(succeeded) / wall_seconds if wall_seconds else 0.0,
+        'throughput_per_second_percentiles': summarize(per_second),
+        'virtual_latency_minutes': summarize([r['virtual_minutes'] for r in succeeded]),
+        'after_publish_minutes': summarize([r['after_publish_minutes'] for r in succeeded]),
+        'real_latency_seconds': summarize([r['real_seconds'] for r in succeeded]),
+        'attempts_per_date': summarize([float(n) for n in server.requests_per_date.values()]),
+        'server': server.stats(),
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    """Wypisuje raport w czytelnej formie."""
+    def fmt(stats: Dict[str, Optional[float]]) -> str:
+        return "  ".join(f"{key}={value:.2f}" if value is not None else f"{key}=-"
+                         for key, value in stats.items())
+
+    print("=" * 70)
+    print(f"📊 RAPORT LOAD TEST ({report['mode']})")
+    print("=" * 70)
+    print(f"Daty: {report['dates']}  ✅ {report['succeeded']}  ❌ {report['failed']}")
+    print(f"Czas rzeczywisty: {report['wall_seconds']:.2f} s")
+    print(f"Przepustowość: {report['throughput_per_second']:.2f} dat/s")
+    print(f"Przepustowość [dat/s w oknach 1 s]: {fmt(report['throughput_per_second_percentiles'])}")
+    print(f"Latencja end-to-end [min wirtualnych]: {fmt(report['virtual_latency_minutes'])}")
+    print(f"Opóźnienie po publikacji [min wirtualnych]: {fmt(report['after_publish_minutes'])}")
+    print(f"Latencja [s rzeczywistych]: {fmt(report['real_latency_seconds'])}")
+    print(f"Próby na datę: {fmt(report['attempts_per_date'])}")
+    print(f"Serwer: {report['server']}")
+
+    if report.get('import_times_ms'):
+        print("Czasy importu [ms]:")
+        for module, value in report['import_times_ms'].items():
+            print(f"  {module:<32} {value:8.2f}" if value is not None else f"  {module:<32} {'-':>8}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load test end-to-end przeciwko lokalnemu serwerowi PSE")
+    parser.add_argument('--mode', choices=['downloader', 'main'], default='downloader')
+    parser.add_argument('--dates', type=int, default=100, help="Liczba kolejnych dat do pobrania")
+    parser.add_argument('--start-date', default='2025-01-01', help="Pierwsza data (YYYY-MM-DD)")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--speedup', type=float, default=600.0,
+                        help="Ile razy zegar wirtualny biegnie szybciej od rzeczywistego")
+    parser.add_argument('--clock-start', default='13:00', help="Wirtualna godzina startu (dzień przed datą)")
+    parser.add_argument('--publish-window', default='13:15-14:30', help="Okno publikacji plików")
+    parser.add_argument('--interval-minutes', type=int, choices=[15, 60], default=60)
+    parser.add_argument('--latency-ms-min', type=float, default=0.0)
+    parser.add_argument('--latency-ms-max', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--truncate-rate', type=float, default=0.0)
+    parser.add_argument('--truncate-mode', choices=['cut', 'rows'], default='cut')
+    parser.add_argument('--client-timeout', type=float, default=2.0,
+                        help="Timeout klienta HTTP w sekundach rzeczywistych")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', dest='json_path', help="Zapisz raport do pliku JSON")
+    parser.add_argument('--verbose', action='store_true', help="Pokaż logi main.py/downloadera")
+    parser.add_argument('--import-times', action='store_true',
+                        help="Dołącz do raportu czasy importu modułów i startu main.py")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    report = run(args)
+    if args.import_times:
+        report['import_times_ms'] = measure_import_times()
+    print_report(report)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    return 0 if report['failed'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Lokalny serwer HTTP udający pse.pl - serwuje syntetyczne pliki PL_PWM_RDN
+z harmonogramem publikacji i wstrzykiwaniem błędów (latencja, timeout, ucięte pliki)
+"""
+
+import datetime
+import functools
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, List, Tuple
+from zoneinfo import ZoneInfo
+
+
+WARSAW_TZ = ZoneInfo('Europe/Warsaw')
+
+FLOAT_COLUMNS = [
+    "Czechy_EXP", "Czechy_IMP",
+    "Słowacja_EXP", "Słowacja_IMP",
+    "Niemcy_EXP", "Niemcy_IMP",
+    "Szwecja_EXP", "Szwecja_IMP",
+    "Ukraina_ZAM_DOB_EXP", "Ukraina_ZAM_DOB_IMP",
+    "Ukraina_RZE_CHA_EXP", "Ukraina_RZE_CHA_IMP",
+    "Litwa_EXP", "Litwa_IMP",
+]
+
+PATH_PATTERN = re.compile(r'^/getcsv/-/export/csv/PL_PWM_RDN/data/(\d{8})$')
+
+
+class CompressedClock:
+    """Zegar wirtualny biegnący `speedup` razy szybciej niż rzeczywisty."""
+
+    def __init__(self, start: datetime.datetime, speedup: float = 600.0):
+        self.start = start
+        self.speedup = speedup
+        self._real_start = time.monotonic()
+
+    def now(self) -> datetime.datetime:
+        """Zwraca bieżący czas wirtualny (lokalny czas Warszawy, naive)."""
+        elapsed = (time.monotonic() - self._real_start) * self.speedup
+        return self.start + datetime.timedelta(seconds=elapsed)
+
+    def sleep(self, seconds: float):
+        """Śpi `seconds` sekund czasu wirtualnego."""
+        time.sleep(max(seconds, 0) / self.speedup)
+
+
+def day_intervals(date_str: str, interval_minutes: int = 60) -> List[str]:
+    """Zwraca etykiety kolumny Godzina dla doby z uwzględnieniem zmiany czasu."""
+    day = datetime.datetime.strptime(date_str, '%Y%m%d')
+    next_day = day + datetime.timedelta(days=1)
+    hours_in_day = round((next_day.replace(tzinfo=WARSAW_TZ).timestamp()
+                          - day.replace(tzinfo=WARSAW_TZ).timestamp()) / 3600)
+
+    if interval_minutes == 60:
+        labels = [str(hour) for hour in range(1, 25)]
+        if hours_in_day == 23:
+            labels.remove("3")
+        elif hours_in_day == 25:
+            labels.insert(labels.index("3") + 1, "2A")
+        return labels
+
+    labels = []
+    for start in range(0, 24 * 60, interval_minutes):
+        end = start + interval_minutes
+        if hours_in_day == 23 and start // 60 == 2:
+            continue
+        labels.append(f"{start // 60:02d}:{start % 60:02d}-{end // 60 % 24:02d}:{end % 60:02d}")
+
+    if hours_in_day == 25:
+        # Powtórzona godzina 02:00-03:00 przy zmianie czasu na zimowy
+        repeated = [label for label in labels if label.startswith("02:")]
+        insert_at = labels.index(repeated[-1]) + 1
+        labels[insert_at:insert_at] = repeated
+    return labels
+
+
+@functools.lru_cache(maxsize=4096)
+def build_csv(date_str: str, interval_minutes: int = 60, encoding: str = 'windows-1250',
+              missing_ratio: float = 0.05) -> bytes:
+    """Generuje deterministyczny plik CSV PL_PWM_RDN dla podanej daty."""
+    rng = random.Random(int(date_str))
+    lines = [";".join(["Data", "Godzina"] + FLOAT_COLUMNS)]
+
+    for label in day_intervals(date_str, interval_minutes):
+        values = []
+        for _ in FLOAT_COLUMNS:
+            if rng.random() < missing_ratio:
+                values.append("-")
+            else:
+                values.append(f"{rng.uniform(0, 1500):.3f}".replace('.', ','))
+        lines.append(";".join([date_str, label] + values))
+
+    return ("\r\n".join(lines) + "\r\n").encode(encoding)
+
+
+class PseStubServer:
+    """Serwer HTTP udający endpoint getcsv PSE z harmonogramem publikacji."""
+
+    def __init__(self, clock: CompressedClock, host: str = '127.0.0.1', port: int = 0,
+                 publish_times: Optional[Dict[str, datetime.datetime]] = None,
+                 default_publish_time: Optional[datetime.datetime] = None,
+                 interval_minutes: int = 60, encoding: str = 'windows-1250',
+                 latency_ms: tuple = (0, 0), timeout_rate: float = 0.0,
+                 hang_seconds: float = 5.0, truncate_rate: float = 0.0,
+                 truncate_mode: str = 'cut', seed: int = 0):
+        self.clock = clock
+        self.publish_times = publish_times or {}
+        self.default_publish_time = default_publish_time
+        self.interval_minutes = interval_minutes
+        self.encoding = encoding
+        self.latency_ms = latency_ms
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.truncate_rate = truncate_rate
+        self.truncate_mode = truncate_mode
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests_per_date: Dict[str, int] = {}
+        self.counters = {'requests': 0, 'not_found': 0, 'served': 0,
+                         'timeouts': 0, 'truncated': 0}
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url_template(self) -> str:
+        """Szablon URL zgodny z `url_template` z config.json."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/getcsv/-/export/csv/PL_PWM_RDN/data/{{data_start}}"
+
+    def start(self) -> 'PseStubServer':
+        """Uruchamia serwer w wątku w tle."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Zatrzymuje serwer."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def is_published(self, date_str: str) -> bool:
+        """Sprawdza czy plik dla daty jest już opublikowany wg zegara wirtualnego."""
+        publish_time = self.publish_times.get(date_str, self.default_publish_time)
+        return publish_time is None or self.clock.now() >= publish_time
+
+    def _draw_fault(self) -> Tuple[Optional[str], float]:
+        with self._lock:
+            roll = self._rng.random()
+            latency = self._rng.uniform(*self.latency_ms) / 1000.0
+        if roll < self.timeout_rate:
+            fault = 'timeout'
+        elif roll < self.timeout_rate + self.truncate_rate:
+            fault = 'truncated'
+        else:
+            fault = None
+        return fault, latency
+
+    def _count(self, counter: str, date_str: Optional[str] = None):
+        with self._lock:
+            self.counters[counter] += 1
+            if date_str is not None:
+                self.requests_per_date[date_str] = self.requests_per_date.get(date_str, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Zwraca liczniki żądań i wstrzykniętych błędów."""
+        with self._lock:
+            return dict(self.counters)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                match = PATH_PATTERN.match(self.path)
+                if not match:
+                    self.send_error(400)
+                    return
+
+                date_str = match.group(1)
+                server._count('requests', date_str)
+                fault, latency = server._draw_fault()
+                if latency:
+                    time.sleep(latency)
+
+                if not server.is_published(date_str):
+                    server._count('not_found')
+                    self.send_error(404)
+                    return
+
+                if fault == 'timeout':
+                    # Brak odpowiedzi - klient powinien przekroczyć swój timeout
+                    server._count('timeouts')
+                    time.sleep(server.hang_seconds)
+                    self.close_connection = True
+                    return
+
+                body = build_csv(date_str, server.interval_minutes, server.encoding)
+                content_length = len(body)
+                if fault == 'truncated':
+                    server._count('truncated')
+                    if server.truncate_mode == 'rows':
+                        # Poprawna odpowiedź HTTP, ale z częścią wierszy (częściowa publikacja)
+                        lines = body.split(b"\r\n")
+                        body = b"\r\n".join(lines[:max(2, len(lines) // 2)]) + b"\r\n"
+                        content_length = len(body)
+                    else:
+                        # Zerwane połączenie w połowie treści
+                        body = body[:len(body) // 2]
+                else:
+                    server._count('served')
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv; charset=' + server.encoding)
+                self.send_header('Content-Length', str(content_length))
+                self.end_headers()
+                self.wfile.write(body)
+                if len(body) < content_length:
+                    self.close_connection = True
+
+        return Handler
@@ -4,18 +4,20 @@ Zoptymalizowana wersja skryptu do pobierania i przetwarzania danych PSE
 Przeznaczona do uruchamiania w GitHub Actions CI/CD
 """
 
+import argparse
 import json
 import sys
 import os
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
-from processor.data_processor import OptimizedDataProcessor
-from downloader.file_downloader import OptimizedFileDownloader
-from database.mongo_connector import OptimizedMongoConnector
+from typing import Dict, Any, Optional, List
+
+# Ciężkie moduły (requests, pymongo, unidecode) są importowane dopiero w main(),
+# gdy wiadomo co będzie robione - krótkie wywołania (np. --status, --help) startują szybciej
 
 
 def load_config(config_path: str = 'config.json') -> Dict[str, Any]:
     """Ładuje konfigurację z pliku JSON z obsługą zmiennych środowiskowych."""
+    from config_loader import load_config as load_compiled_config
     
     # Najpierw sprawdzaj czy istnieje config.local.json (dla developmentu)
     local_config_path = 'config.local.json'
@@ -26,22 +28,16 @@ def load_config(config_path: str = 'config.json') -> Dict[str, Any]:
         print(f"📄 Wczytywanie konfiguracji z: {config_path}")
     
     try:
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        
-        # Podmiana zmiennych środowiskowych
-        config_str = json.dumps(config)
-        for key, value in os.environ.items():
-            if key.startswith('MONGODB_'):
-                config_str = config_str.replace(f'${{{key}}}', value)
-        
-        return json.loads(config_str)
+        return load_compiled_config(config_path)
     except FileNotFoundError:
         print(f"Błąd: Plik konfiguracyjny {config_path} nie został znaleziony")
         sys.exit(1)
     except json.JSONDecodeError as e:
         print(f"Błąd: Nieprawidłowy format JSON w pliku {config_path}: {e}")
         sys.exit(1)
+    except ValueError as e:
+        print(f"Błąd: Nieprawidłowa konfiguracja w pliku {config_path}: {e}")
+        sys.exit(1)
 
 
 def get_target_date() -> str:
@@ -50,25 +46,58 @@ def get_target_date() -> str:
     return tomorrow.strftime('%Y-%m-%d')
 
 
-def main():
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parsuje argumenty linii poleceń."""
+    parser = argparse.ArgumentParser(description="Pobieranie danych PL_PWM_RDN z PSE do MongoDB")
+    parser.add_argument('--date', help="Data docelowa YYYY-MM-DD (domyślnie jutro)")
+    parser.add_argument('--once', action='store_true',
+                        help="Pojedyncza próba pobrania bez czekania na publikację")
+    parser.add_argument('--status', action='store_true',
+                        help="Tylko sprawdź czy dane dla daty są już w bazie")
+    return parser.parse_args(argv)
+
+
+def check_status(mongo_connector, file_config: Dict[str, Any], target_date: str) -> int:
+    """Sprawdza czy rekord dla daty docelowej istnieje w bazie."""
+    from processor.data_processor import to_utc
+
+    data_cet = to_utc(datetime.strptime(target_date, '%Y-%m-%d'))
+    record = mongo_connector.find_document(file_config["kolekcja_mongo"], {'dataCet': data_cet})
+    if record is None:
+        print(f"📭 Brak danych dla daty {target_date}")
+        return 1
+
+    print(f"✅ Dane dla daty {target_date} są w bazie ({len(record.get('dane', []))} wierszy)")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None):
     """Główna funkcja aplikacji."""
+    args = parse_args(argv if argv is not None else [])
     print("🚀 Uruchamianie zoptymalizowanego skryptu PSE...")
     
     # Ładowanie konfiguracji
     config = load_config()
     
     # Ustawienie daty docelowej
-    target_date = get_target_date()
+    target_date = args.date or get_target_date()
     print(f"📅 Pobieranie danych dla daty: {target_date}")
     
+    from database.mongo_connector import OptimizedMongoConnector
+
     # Konfiguracja bazy danych
     mongo_config = config["database"]
+    cache_config = mongo_config.get("cache", {})
     mongo_connector = OptimizedMongoConnector(
         host=mongo_config['host'],
         port=mongo_config['port'],
         username=mongo_config['username'],
         password=mongo_config['password'],
-        db_name=mongo_config['db_name']
+        db_name=mongo_config['db_name'],
+        cache_enabled=cache_config.get('enabled', False),
+        cache_max_entries=cache_config.get('max_entries', 256),
+        cache_ttl_seconds=cache_config.get('ttl_seconds', 300),
+        cache_max_bytes=cache_config.get('max_bytes', 16 * 1024 * 1024)
     )
     
     # Konfiguracja pobierania danych
@@ -76,14 +105,13 @@ def main():
     file_config = config["pobierz"][file_key]
     
     try:
-        # Pobieranie danych
-        print("📥 Pobieranie danych z PSE...")
-        downloader = OptimizedFileDownloader(
-            url_template=file_config["url_template"],
-            data_start=target_date
-        )
-        
+        if args.status:
+            return check_status(mongo_connector, file_config, target_date)
+
+        from processor.data_processor import OptimizedDataProcessor
+
         # Pobieranie i przetwarzanie danych w jednym kroku
+        print("📥 Pobieranie danych z PSE...")
         processor = OptimizedDataProcessor(
             url_template=file_config["url_template"],
             data_start=target_date,
@@ -94,7 +122,12 @@ def main():
             fields_to_add_hour=file_config.get("fields_to_add_hour", {}),
             mongo_connector=mongo_connector,
             kolekcja_mongo=file_config["kolekcja_mongo"],
-            date_format=file_config.get("date_format", "%Y%m%d")
+            date_format=file_config.get("date_format", "%Y%m%d"),
+            column_names=file_config.get("column_names"),
+            max_retries=1 if args.once else None,
+            validation=file_config.get("validation"),
+            storage_codec=file_config.get("storage_codec"),
+            max_repolls=1 if args.once else None
         )
         
         # Uruchomienie przetwarzania
@@ -111,9 +144,14 @@ def main():
         print(f"❌ Błąd krytyczny: {e}")
         return 1
     finally:
+        stats = mongo_connector.cache_stats()
+        if stats:
+            print(f"📦 Cache MongoDB: {stats['hits']} trafień, {stats['misses']} chybień, "
+                  f"{stats['entries']} wpisów ({stats['bytes']} B)")
+
         # Zamykanie połączenia z bazą danych
         mongo_connector.disconnect()
 
 
 if __name__ == "__main__":
-    sys.exit(main()) 
\ No newline at end of file
+    sys.exit(main(sys.argv[1:])) 
\ No newline at end of file
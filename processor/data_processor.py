@@ -5,20 +5,43 @@ Zoptymalizowany procesor danych do przetwarzania CSV bez zapisywania plików lok
 import csv
 import io
 import datetime
-import pytz
 from typing import List, Dict, Any, Optional
-from unidecode import unidecode
+from zoneinfo import ZoneInfo
 from database.mongo_connector import OptimizedMongoConnector
 
 
+WARSAW_TZ = ZoneInfo('Europe/Warsaw')
+
+
+def to_utc(local_date: datetime.datetime, first_occurrence: bool = False) -> datetime.datetime:
+    """Konwertuje datę lokalną (Europe/Warsaw) na UTC.
+
+    Dla godzin niejednoznacznych i nieistniejących przy zmianie czasu wybierany
+    jest czas zimowy - tak samo jak pytz.localize(is_dst=False). Z first_occurrence=True
+    godzina powtórzona przy zmianie czasu na zimowy to jej pierwsze wystąpienie (czas letni).
+    """
+    aware = local_date.replace(tzinfo=WARSAW_TZ)
+    if first_occurrence:
+        return aware.astimezone(datetime.timezone.utc)
+    if aware.dst():
+        standard = aware.replace(fold=1)
+        if not standard.dst():
+            aware = standard
+    return aware.astimezone(datetime.timezone.utc)
+
+
 class OptimizedDataProcessor:
     """Zoptymalizowany procesor danych do przetwarzania CSV w pamięci."""
 
+    REPOLL_MAX_ATTEMPTS = 6    # Maksymalna liczba pobrań gdy plik jest niekompletny
+
     def __init__(self, url_template: str, data_start: str, int_cols: List[str],
                  float_cols: List[str], date_cols: List[str],
                  fields_to_utc: List[str] = None, fields_to_add_hour: Dict[str, str] = None,
                  date_format: str = None, mongo_connector: OptimizedMongoConnector = None,
-                 kolekcja_mongo: str = None):
+                 kolekcja_mongo: str = None, column_names: Dict[str, str] = None,
+                 max_retries: Optional[int] = None, validation: Dict[str, Any] = None,
+                 storage_codec: Optional[str] = None, max_repolls: Optional[int] = None):
         self.url_template = url_template
         self.data_start = data_start
         self.int_cols = int_cols
@@ -29,6 +52,19 @@ class OptimizedDataProcessor:
         self.date_format = date_format
         self.mongo_connector = mongo_connector
         self.kolekcja_mongo = kolekcja_mongo
+        self.max_retries = max_retries      # próby HTTP w jednym pobraniu
+        self.max_repolls = max_repolls      # pobrania gdy doba jest niekompletna
+        self.storage_codec = storage_codec
+
+        # Cache znormalizowanych nazw kolumn (może być prekompilowany w konfiguracji)
+        self._column_names = dict(column_names or {})
+
+        # Walidacja doby przed zapisem (niekompletne dane są pobierane ponownie)
+        self.validation = validation or {}
+        self.interval_column = next(iter(self.fields_to_add_hour.values()), 'Godzina')
+        self.last_raw_intervals: List[str] = []
+        self.last_row_intervals: List[str] = []
+        self.last_rejected_rows = 0
 
         # Konwersja daty startowej
         self.data_start_dt = datetime.datetime.strptime(data_start, '%Y-%m-%d')
@@ -49,35 +85,60 @@ class OptimizedDataProcessor:
         except ValueError:
             raise ValueError(f"Nieprawidłowy format daty: {date_string}")
 
-    def convert_to_utc(self, local_date: datetime.datetime) -> datetime.datetime:
+    def convert_to_utc(self, local_date: datetime.datetime,
+                       first_occurrence: bool = False) -> datetime.datetime:
         """Konwertuje datę lokalną na UTC."""
-        warsaw_tz = pytz.timezone('Europe/Warsaw')
-        local_date = warsaw_tz.localize(local_date)
-        return local_date.astimezone(pytz.UTC)
+        return to_utc(local_date, first_occurrence)
+
+    def _normalize_key(self, key: str) -> str:
+        """Zwraca znormalizowaną nazwę kolumny, licząc ją tylko raz dla każdego nagłówka."""
+        normalized = self._column_names.get(key)
+        if normalized is None:
+            from unidecode import unidecode
+            normalized = unidecode(key.replace(" ", "_"))
+            self._column_names[key] = normalized
+        return normalized
 
     def process_csv_content(self, csv_content: bytes) -> List[Dict[str, Any]]:
         """Przetwarza zawartość CSV w pamięci."""
         processed_data = []
 
-        # Dekodowanie zawartości z kodowania windows-1252
+        # Dekodowanie zawartości - PSE publikuje pliki w windows-1250 (polskie znaki
+        # w nagłówkach, np. 'Słowacja'); poprawny UTF-8 jest rozpoznawany jako pierwszy
         try:
-            content_str = csv_content.decode('windows-1252')
+            content_str = csv_content.decode('utf-8')
         except UnicodeDecodeError:
-            # Fallback do UTF-8
-            content_str = csv_content.decode('utf-8', errors='ignore')
+            content_str = csv_content.decode('windows-1250', errors='replace')
 
         # Przetwarzanie CSV z pamięci
         csv_reader = csv.DictReader(io.StringIO(content_str), delimiter=';')
 
         row_count = 0
+        raw_intervals = []
+        row_intervals = []
+        seen_intervals = set()
         for row in csv_reader:
             row_count += 1
-            processed_row = self._process_row(row)
+            # Surowa etykieta interwału (przed konwersją) - potrzebna do walidacji doby
+            label = row.get(self.interval_column) or ''
+            # Godzina powtórzona przy zmianie czasu na zimowy ('2A' lub drugie wystąpienie
+            # etykiety 15-minutowej) to czas zimowy, pierwsze wystąpienie - czas letni
+            repeated = label == '2A' or label in seen_intervals
+            seen_intervals.add(label)
+            raw_intervals.append(label)
+            processed_row = self._process_row(row, repeated)
             if processed_row:
                 processed_data.append(processed_row)
+                row_intervals.append(label)
+
+        self.last_raw_intervals = raw_intervals
+        self.last_row_intervals = row_intervals
+        self.last_rejected_rows = row_count - len(processed_data)
 
         print(f"🔍 DEBUG: Przeczytano {row_count} wierszy z CSV")
         print(f"🔍 DEBUG: Przetworzono {len(processed_data)} wierszy do bazy")
+        if self.last_rejected_rows:
+            print(f"⚠️  Odrzucono {self.last_rejected_rows} wierszy z błędami")
         
         # Wyświetl szczegóły pierwszych 3 wierszy
         if processed_data:
@@ -87,7 +148,7 @@ class OptimizedDataProcessor:
 
         return processed_data
 
-    def _process_row(self, row: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    def _process_row(self, row: Dict[str, str], repeated: bool = False) -> Optional[Dict[str, Any]]:
         """Przetwarza pojedynczy wiersz danych."""
         try:
             # Konwersja kolumn int
@@ -145,17 +206,33 @@ class OptimizedDataProcessor:
                         if row[add_hour_field] is not None:
                             local_date += datetime.timedelta(
                                 hours=row[add_hour_field])
-                            row[column] = self.convert_to_utc(local_date)
+                            row[column] = self.convert_to_utc(
+                                local_date, first_occurrence=not repeated)
 
             # Normalizacja nazw kolumn
-            processed_row = {unidecode(key.replace(
-                " ", "_")): value for key, value in row.items()}
+            processed_row = {self._normalize_key(key): value
+                             for key, value in row.items()}
             return processed_row
 
         except Exception as e:
             print(f"Błąd podczas przetwarzania wiersza: {e}")
             return None
 
+    def validate_day(self, data: List[Dict[str, Any]]):
+        """Waliduje kompletność doby (ostatnio przetworzonej przez process_csv_content)."""
+        from processor.validator import DayValidator
+
+        validator = DayValidator(
+            value_columns=[self._normalize_key(column) for column in self.float_cols],
+            interval_column=self._normalize_key(self.interval_column),
+            timestamp_column=self._normalize_key(next(iter(self.fields_to_add_hour), 'Data')),
+            min_value=self.validation.get('min_value'),
+            max_value=self.validation.get('max_value'),
+            max_missing_ratio=self.validation.get('max_missing_ratio')
+        )
+        return validator.validate(self.data_start, data, self.last_raw_intervals,
+                                  self.last_rejected_rows, self.last_row_intervals)
+
     def save_to_mongo(self, data: List[Dict[str, Any]]) -> bool:
         """Zapisuje dane do MongoDB z optymalizacją."""
         try:
@@ -163,6 +240,14 @@ class OptimizedDataProcessor:
                 print("Błąd: Brak połączenia z MongoDB")
                 return False
 
+            # Opcjonalne kodowanie kolumnowe pola `dane` (dekodowane przez łącznik przy odczycie)
+            if self.storage_codec:
+                from database.dane_codec import CODEC_NAME, encode_dane
+                if self.storage_codec != CODEC_NAME:
+                    print(f"Błąd: Nieznany kodek zapisu: {self.storage_codec}")
+                    return False
+                data = encode_dane(data)
+
             data_start_utc = self.convert_to_utc(self.data_start_dt)
             # Filtr musi używać camelCase aby pasowało do bazy
             filtr = {'dataCet': data_start_utc}
@@ -175,7 +260,7 @@ class OptimizedDataProcessor:
                 # Wstawienie nowego rekordu
                 new_document = {
                     'dataCet': data_start_utc,
-                    'dataWstawienia': datetime.datetime.now(pytz.UTC),
+                    'dataWstawienia': datetime.datetime.now(datetime.timezone.utc),
                     'dane': data
                 }
                 self.mongo_connector.insert_document(
@@ -185,7 +270,7 @@ class OptimizedDataProcessor:
                 # Aktualizacja istniejącego rekordu
                 update_data = {
                     '$set': {
-                        'czasAktualizacji': datetime.datetime.now(pytz.UTC),
+                        'czasAktualizacji': datetime.datetime.now(datetime.timezone.utc),
                         'dane': data
                     }
                 }
@@ -205,22 +290,45 @@ class OptimizedDataProcessor:
             # Pobieranie danych
             from downloader.file_downloader import OptimizedFileDownloader
             downloader = OptimizedFileDownloader(
-                self.url_template, self.data_start)
-            csv_content = downloader.download()
+                self.url_template, self.data_start, max_retries=self.max_retries)
 
-            if not csv_content:
-                print("❌ Nie udało się pobrać danych")
-                return False
+            validation_enabled = self.validation.get('enabled', True)
+            max_polls = self.max_repolls or self.validation.get('max_repolls', self.REPOLL_MAX_ATTEMPTS)
 
-            # Przetwarzanie danych
-            print("🔄 Przetwarzanie danych...")
-            processed_data = self.process_csv_content(csv_content)
+            poll = 0
+            while True:
+                poll += 1
+                csv_content = downloader.download()
 
-            if not processed_data:
-                print("❌ Brak danych do przetworzenia")
-                return False
+                if not csv_content:
+                    print("❌ Nie udało się pobrać danych")
+                    return False
 
-            print(f"📊 Przetworzono {len(processed_data)} wierszy danych")
+                # Przetwarzanie danych
+                print("🔄 Przetwarzanie danych...")
+                processed_data = self.process_csv_content(csv_content)
+
+                if processed_data:
+                    print(f"📊 Przetworzono {len(processed_data)} wierszy danych")
+
+                    if not validation_enabled:
+                        break
+
+                    report = self.validate_day(processed_data)
+                    report.print_summary()
+                    if report.complete:
+                        break
+                else:
+                    # Sam nagłówek lub wszystkie wiersze odrzucone - plik mógł nie być jeszcze
+                    # w pełni opublikowany, więc traktujemy go jak niekompletną dobę
+                    print("❌ Brak danych do przetworzenia")
+
+                # Niekompletna doba (np. częściowa publikacja) - nie zapisujemy, pobieramy ponownie
+                if poll >= max_polls:
+                    print(f"❌ Dane dla {self.data_start} nadal niekompletne po {poll} pobraniach - "
+                          f"pomijam zapis")
+                    return False
+                downloader.wait_before_retry(poll)
 
             # Zapis do bazy danych
             return self.save_to_mongo(processed_data)
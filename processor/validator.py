@@ -0,0 +1,187 @@
+"""
+Wektorowa walidacja kompletności i poprawności danych doby przed zapisem do MongoDB
+"""
+
+import datetime
+from typing import List, Dict, Any, Optional
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+
+WARSAW_TZ = ZoneInfo('Europe/Warsaw')
+
+
+def _as_float(value: Any) -> float:
+    """Wartość liczbowa albo NaN dla braków ('-', puste, nieprzekonwertowane napisy)."""
+    return value if isinstance(value, (int, float)) else np.nan
+
+
+def _as_epoch(value: Any) -> float:
+    """Znacznik czasu w sekundach od epoki albo NaN."""
+    return value.timestamp() if isinstance(value, datetime.datetime) else np.nan
+
+
+def _label_minute(label: str) -> int:
+    """Minuta początku interwału z etykiety 'HH:MM-HH:MM' (0 dla etykiet godzinowych)."""
+    if '-' in label and ':' in label:
+        return int(label.split('-', 1)[0].strip()[3:5])
+    return 0
+
+
+class ValidationReport:
+    """Wynik walidacji doby."""
+
+    def __init__(self):
+        self.errors: List[str] = []
+        self.warnings: List[str] = []
+        self.stats: Dict[str, Any] = {}
+
+    @property
+    def complete(self) -> bool:
+        """Czy dane doby można zapisać jako kompletne."""
+        return not self.errors
+
+    def print_summary(self):
+        """Wypisuje błędy i ostrzeżenia walidacji."""
+        for warning in self.warnings:
+            print(f"⚠️  Walidacja: {warning}")
+        for error in self.errors:
+            print(f"❌ Walidacja: {error}")
+        if self.complete:
+            print(f"✅ Walidacja: {self.stats.get('rows')} interwałów, dane kompletne")
+
+
+class DayValidator:
+    """Sprawdza liczbę interwałów (z uwzględnieniem zmiany czasu), duplikaty,
+    udział braków danych i zakresy wartości EXP/IMP dla całej doby naraz."""
+
+    DEFAULT_MIN_VALUE = 0.0
+    DEFAULT_MAX_VALUE = 10000.0     # MW - z dużym zapasem ponad przepustowość połączeń
+    DEFAULT_MAX_MISSING_RATIO = 0.9
+
+    def __init__(self, value_columns: List[str], interval_column: str = 'Godzina',
+                 timestamp_column: str = 'Data', min_value: Optional[float] = None,
+                 max_value: Optional[float] = None, max_missing_ratio: Optional[float] = None):
+        self.value_columns = value_columns
+        self.interval_column = interval_column
+        self.timestamp_column = timestamp_column
+        self.min_value = self.DEFAULT_MIN_VALUE if min_value is None else min_value
+        self.max_value = self.DEFAULT_MAX_VALUE if max_value is None else max_value
+        self.max_missing_ratio = (self.DEFAULT_MAX_MISSING_RATIO
+                                  if max_missing_ratio is None else max_missing_ratio)
+
+    @staticmethod
+    def hours_in_day(date_string: str) -> int:
+        """Zwraca liczbę godzin doby (23/24/25) w strefie Europe/Warsaw."""
+        day = datetime.datetime.strptime(date_string, '%Y-%m-%d')
+        next_day = day + datetime.timedelta(days=1)
+        seconds = (next_day.replace(tzinfo=WARSAW_TZ).timestamp()
+                   - day.replace(tzinfo=WARSAW_TZ).timestamp())
+        return round(seconds / 3600)
+
+    @staticmethod
+    def interval_minutes(labels: np.ndarray) -> int:
+        """Wykrywa rozdzielczość danych na podstawie etykiet kolumny Godzina."""
+        if len(labels):
+            label = labels[0]
+            if '-' in label and ':' in label:
+                start, end = (part.strip() for part in label.split('-', 1))
+                start_minutes = int(start[:2]) * 60 + int(start[3:5])
+                end_minutes = int(end[:2]) * 60 + int(end[3:5])
+                return (end_minutes - start_minutes) % (24 * 60) or 24 * 60
+        return 60
+
+    def validate(self, date_string: str, rows: List[Dict[str, Any]], raw_intervals: List[str],
+                 rejected_rows: int = 0,
+                 row_intervals: Optional[List[str]] = None) -> ValidationReport:
+        """Waliduje przetworzone wiersze doby wraz z surowymi etykietami interwałów.
+
+        `row_intervals` to etykiety interwałów wierszy z `rows` (w tej samej kolejności);
+        pozwalają odróżnić interwały 15-minutowe w obrębie tej samej godziny.
+        """
+        report = ValidationReport()
+
+        if rejected_rows:
+            report.errors.append(f"{rejected_rows} wierszy odrzuconych podczas przetwarzania")
+
+        # Liczba interwałów z uwzględnieniem doby 23/25-godzinnej
+        labels = np.asarray([str(label).strip() for label in raw_intervals], dtype=object)
+        hours = self.hours_in_day(date_string)
+        resolution = self.interval_minutes(labels)
+        expected = hours * 60 // resolution
+        report.stats.update({'rows': len(rows), 'intervals': len(labels),
+                             'expected_intervals': expected, 'interval_minutes': resolution})
+        if len(labels) != expected:
+            report.errors.append(
+                f"liczba interwałów {len(labels)} zamiast {expected} "
+                f"(doba {hours}h, rozdzielczość {resolution} min)")
+
+        # Duplikaty etykiet - przy zmianie czasu na zimowy godzina 02:00-03:00 występuje dwa razy
+        if len(labels):
+            unique, counts = np.unique(labels.astype(str), return_counts=True)
+            allowed = np.ones_like(counts)
+            if hours == 25:
+                allowed[np.char.startswith(unique, '02:')] = 2
+            duplicated = unique[counts > allowed]
+            if duplicated.size:
+                report.errors.append(f"zduplikowane interwały: {', '.join(duplicated[:5])}")
+
+        if not rows:
+            report.errors.append("brak wierszy danych")
+            return report
+
+        n_rows = len(rows)
+        unparsed = np.fromiter((row.get(self.interval_column) is None for row in rows),
+                               dtype=bool, count=n_rows)
+        if unparsed.any():
+            report.errors.append(f"{int(unparsed.sum())} wierszy bez poprawnej godziny")
+
+        # Duplikaty znaczników czasu po konwersji do UTC (np. '3' i '2A' w tej samej godzinie)
+        timestamps = np.fromiter((_as_epoch(row.get(self.timestamp_column)) for row in rows),
+                                 dtype=np.float64, count=n_rows)
+        if row_intervals is not None and len(row_intervals) == n_rows:
+            timestamps += 60.0 * np.fromiter((_label_minute(str(label)) for label in row_intervals),
+                                             dtype=np.float64, count=n_rows)
+        timestamps = timestamps[~np.isnan(timestamps)]
+        unique_ts, ts_counts = np.unique(timestamps, return_counts=True)
+        duplicated_ts = unique_ts[ts_counts > 1]
+        if duplicated_ts.size:
+            first = datetime.datetime.fromtimestamp(duplicated_ts[0], datetime.timezone.utc)
+            report.errors.append(
+                f"{duplicated_ts.size} zduplikowanych znaczników czasu '{self.timestamp_column}' "
+                f"(pierwszy: {first.isoformat()})")
+
+        # Kolumna nieobecna we wszystkich wierszach to niezgodny nagłówek lub kodowanie pliku
+        absent_columns = [column for column in self.value_columns
+                          if not any(column in row for row in rows)]
+        if absent_columns:
+            report.errors.append(
+                f"brak kolumn w pliku (nagłówek/kodowanie): {', '.join(absent_columns)}")
+
+        # Macierz wartości (wiersze x kolumny) budowana kolumnami; braki jako NaN
+        values = np.empty((n_rows, len(self.value_columns)), dtype=np.float64)
+        for index, column in enumerate(self.value_columns):
+            values[:, index] = np.fromiter((_as_float(row.get(column)) for row in rows),
+                                           dtype=np.float64, count=n_rows)
+        missing = np.isnan(values)
+
+        missing_ratio = float(missing.mean()) if missing.size else 0.0
+        report.stats['missing_ratio'] = missing_ratio
+        if missing_ratio > self.max_missing_ratio:
+            report.errors.append(
+                f"udział braków danych {missing_ratio:.0%} przekracza {self.max_missing_ratio:.0%}")
+
+        empty_columns = [column for column, empty in zip(self.value_columns, missing.all(axis=0))
+                         if empty and column not in absent_columns]
+        if empty_columns:
+            report.warnings.append(f"kolumny bez danych: {', '.join(empty_columns)}")
+
+        out_of_range = ~missing & ((values < self.min_value) | (values > self.max_value))
+        bad_columns = [column for column, bad in zip(self.value_columns, out_of_range.any(axis=0)) if bad]
+        if bad_columns:
+            report.errors.append(
+                f"wartości poza zakresem [{self.min_value}, {self.max_value}] w kolumnach: "
+                f"{', '.join(bad_columns)}")
+
+        return report
@@ -0,0 +1,8 @@
+"""
+Wspólna konfiguracja testów - moduły aplikacji importowane z katalogu głównego repozytorium
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
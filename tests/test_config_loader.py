@@ -0,0 +1,147 @@
+"""
+Testy ładowania konfiguracji: walidacja, podmiana ${MONGODB_*} i cache skompilowanej postaci
+"""
+
+import copy
+import json
+import os
+
+import pytest
+
+import config_loader
+from config_loader import compile_config, expand_env, is_cacheable, load_compiled, load_config
+
+
+RAW_CONFIG = {
+    "database": {
+        "host": "${MONGODB_HOST}",
+        "port": "${MONGODB_PORT}",
+        "username": "${MONGODB_USERNAME}",
+        "password": "${MONGODB_PASSWORD}",
+        "db_name": "${MONGODB_DB_NAME}"
+    },
+    "pobierz": {
+        "file_2": {
+            "url_template": "https://example.invalid/{data_start}",
+            "kolekcja_mongo": "PL_PWM_RDN",
+            "int_cols": ["Godzina"],
+            "float_cols": ["Słowacja_EXP"],
+            "date_cols": ["Data"]
+        }
+    }
+}
+
+
+def write_config(tmp_path, config) -> str:
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps(config), encoding='utf-8')
+    return str(path)
+
+
+def test_compile_fills_feed_defaults_and_column_names():
+    feed = compile_config(copy.deepcopy(RAW_CONFIG))['config']['pobierz']['file_2']
+
+    assert feed['fields_to_utc'] == []
+    assert feed['fields_to_add_hour'] == {}
+    assert feed['date_format'] == '%Y%m%d'
+    assert feed['column_names']['Słowacja_EXP'] == 'Slowacja_EXP'
+
+
+def test_compile_rejects_missing_keys():
+    raw = copy.deepcopy(RAW_CONFIG)
+    del raw['pobierz']['file_2']['float_cols']
+
+    with pytest.raises(ValueError, match='float_cols'):
+        compile_config(raw)
+
+    raw = copy.deepcopy(RAW_CONFIG)
+    del raw['database']['password']
+    with pytest.raises(ValueError, match='password'):
+        compile_config(raw)
+
+
+def test_compile_validates_storage_codec():
+    raw = copy.deepcopy(RAW_CONFIG)
+    raw['pobierz']['file_2']['storage_codec'] = 'f64le'
+    assert compile_config(raw)['config']['pobierz']['file_2']['storage_codec'] == 'f64le'
+
+    raw['pobierz']['file_2']['storage_codec'] = 'f32'
+    with pytest.raises(ValueError, match='f32'):
+        compile_config(raw)
+
+
+def test_expand_env_substitutes_only_set_mongodb_variables():
+    raw = copy.deepcopy(RAW_CONFIG)
+    raw['database']['host'] = "${MONGODB_HOST}:${MONGODB_PORT}"
+    raw['pobierz']['file_2']['url_template'] = "${HOME}/{data_start}"
+    compiled = compile_config(raw)
+
+    config = expand_env(compiled, {'MONGODB_HOST': 'db', 'MONGODB_PORT': '27017', 'HOME': '/root'})
+
+    assert config['database']['host'] == 'db:27017'
+    assert config['database']['port'] == '27017'
+    # Nieustawione zmienne zostają bez zmian, zmienne spoza MONGODB_* nie są podmieniane
+    assert config['database']['password'] == '${MONGODB_PASSWORD}'
+    assert config['pobierz']['file_2']['url_template'] == '${HOME}/{data_start}'
+
+
+def test_expand_env_does_not_expand_values_recursively():
+    compiled = compile_config(copy.deepcopy(RAW_CONFIG))
+
+    config = expand_env(compiled, {'MONGODB_PASSWORD': '${MONGODB_HOST}', 'MONGODB_HOST': 'db'})
+
+    assert config['database']['password'] == '${MONGODB_HOST}'
+
+
+def test_cache_is_json_and_reused(tmp_path, monkeypatch):
+    path = write_config(tmp_path, RAW_CONFIG)
+
+    first = load_compiled(path)
+    cache_path = config_loader._cache_path(path)
+    with open(cache_path, 'r', encoding='utf-8') as f:
+        cached = json.load(f)
+    assert cached['compiled'] == first
+
+    monkeypatch.setattr(config_loader, 'compile_config', lambda raw: pytest.fail("cache nieużyty"))
+    assert load_compiled(path) == first
+
+
+def test_cache_is_refreshed_after_change(tmp_path):
+    path = write_config(tmp_path, RAW_CONFIG)
+    load_compiled(path)
+
+    raw = copy.deepcopy(RAW_CONFIG)
+    raw['pobierz']['file_2']['kolekcja_mongo'] = 'INNA_KOLEKCJA'
+    write_config(tmp_path, raw)
+    os.utime(path, ns=(0, 1))
+
+    assert load_compiled(path)['config']['pobierz']['file_2']['kolekcja_mongo'] == 'INNA_KOLEKCJA'
+
+
+def test_database_cache_settings_do_not_disable_cache(tmp_path):
+    raw = copy.deepcopy(RAW_CONFIG)
+    raw['database']['cache'] = {"enabled": True, "max_entries": 256, "ttl_seconds": 300}
+    path = write_config(tmp_path, raw)
+
+    assert is_cacheable(raw)
+    load_compiled(path)
+
+    assert os.path.exists(config_loader._cache_path(path))
+
+
+def test_literal_credentials_are_never_cached(tmp_path):
+    raw = copy.deepcopy(RAW_CONFIG)
+    raw['database'].update({'password': 'tajne', 'port': 27017})
+    path = write_config(tmp_path, raw)
+    assert not is_cacheable(raw)
+
+    # Cache pozostawiony przez wcześniejszą wersję zostaje usunięty
+    legacy_path = config_loader._cache_path(path)[:-len('.json')]
+    os.makedirs(os.path.dirname(legacy_path), exist_ok=True)
+    with open(legacy_path, 'wb') as f:
+        f.write(b'tajne')
+
+    config = load_config(path)
+
+    assert config['database']['password'] == 'tajne'
+    assert os.listdir(os.path.dirname(legacy_path)) == []
@@ -0,0 +1,89 @@
+"""
+Testy kodeka kolumnowego pola `dane` (f64le)
+"""
+
+import datetime
+import math
+
+import bson
+import numpy as np
+import pytest
+
+from database.dane_codec import (CODEC_NAME, NULL_TIMESTAMP, decode_dane, decode_dane_arrays,
+                                 encode_dane, is_packed)
+
+
+ROWS = [
+    {'Data': datetime.datetime(2025, 10, 26, 0, 0), 'Godzina': 3, 'Słowacja_EXP': 120.5, 'Uwagi': 'a'},
+    {'Data': datetime.datetime(2025, 10, 26, 1, 0), 'Godzina': 4, 'Słowacja_EXP': None, 'Uwagi': None},
+    {'Data': None, 'Godzina': None, 'Słowacja_EXP': 0.0, 'Uwagi': 'c'},
+]
+
+
+def bson_round_trip(packed):
+    return bson.decode(bson.encode({'dane': packed}))['dane']
+
+
+def test_round_trip_through_bson():
+    packed = encode_dane(ROWS)
+
+    assert is_packed(packed)
+    assert packed['keys'] == ['Data', 'Godzina', 'Słowacja_EXP', 'Uwagi']
+    assert packed['int'] == ['Godzina']
+    assert decode_dane(bson_round_trip(packed)) == ROWS
+
+
+def test_types_and_missing_values_are_restored():
+    rows = decode_dane(bson_round_trip(encode_dane(ROWS)))
+
+    assert type(rows[0]['Godzina']) is int
+    assert type(rows[2]['Słowacja_EXP']) is float
+    assert rows[1]['Słowacja_EXP'] is None
+    assert rows[2]['Data'] is None
+
+
+def test_aware_timestamps_are_stored_as_utc():
+    warsaw = datetime.timezone(datetime.timedelta(hours=2))
+    rows = [{'Data': datetime.datetime(2025, 6, 1, 2, 0, tzinfo=warsaw)}]
+
+    # Jak w BSON - odczyt zwraca datę UTC bez strefy
+    assert decode_dane(encode_dane(rows)) == [{'Data': datetime.datetime(2025, 6, 1, 0, 0)}]
+
+
+def test_missing_keys_and_nan_values():
+    rows = [{'A': 1.5}, {'B': float('nan')}]
+
+    decoded = decode_dane(encode_dane(rows))
+
+    assert decoded == [{'A': 1.5, 'B': None}, {'A': None, 'B': None}]
+
+
+def test_numpy_views_use_nan_and_nat():
+    packed = bson_round_trip(encode_dane(ROWS))
+
+    arrays = decode_dane_arrays(packed)
+
+    assert arrays['Data'].dtype == np.dtype('datetime64[ms]')
+    assert np.isnat(arrays['Data'][2])
+    assert arrays['Data'][0] == np.datetime64('2025-10-26T00:00')
+    assert math.isnan(arrays['Słowacja_EXP'][1])
+    assert arrays['Uwagi'] == ['a', None, 'c']
+    # Widoki na bufor BSON - tylko do odczytu
+    assert not arrays['Słowacja_EXP'].flags.writeable
+    assert np.frombuffer(packed['ts']['Data'], dtype='<i8')[2] == NULL_TIMESTAMP
+
+
+def test_empty_and_unsupported_version():
+    assert decode_dane(encode_dane([])) == []
+
+    packed = encode_dane(ROWS)
+    packed['_v'] = 99
+    with pytest.raises(ValueError, match=CODEC_NAME):
+        decode_dane(packed)
+    with pytest.raises(ValueError):
+        decode_dane_arrays(packed)
+
+
+def test_is_packed_rejects_row_lists():
+    assert not is_packed(ROWS)
+    assert not is_packed({'_codec': 'inny'})
@@ -0,0 +1,211 @@
+"""
+Testy cache odczytów (ReadThroughCache) i jego unieważniania przez zapisy łącznika MongoDB
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from database import mongo_connector
+from database.mongo_connector import OptimizedMongoConnector, ReadThroughCache, _MISSING
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(mongo_connector.time, 'monotonic', fake)
+    return fake
+
+
+class FakeCollection:
+    """Kolekcja w pamięci licząca zapytania."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.queries = 0
+
+    def _match(self, filtr):
+        return [doc for doc in self.documents
+                if all(doc.get(key) == value for key, value in filtr.items())]
+
+    def find_one(self, filtr):
+        self.queries += 1
+        return next((dict(doc) for doc in self._match(filtr)), None)
+
+    def find(self, filtr, projection=None):
+        self.queries += 1
+        return [dict(doc) for doc in self._match(filtr)]
+
+    def insert_one(self, document):
+        self.documents.append(document)
+        return SimpleNamespace(inserted_id=len(self.documents))
+
+    def update_one(self, filtr, nowe_dane):
+        matched = self._match(filtr)[:1]
+        for doc in matched:
+            doc.update(nowe_dane['$set'])
+        return SimpleNamespace(matched_count=len(matched), modified_count=len(matched))
+
+    def delete_many(self, filtr):
+        deleted = len(self.documents)
+        self.documents.clear()
+        return SimpleNamespace(deleted_count=deleted)
+
+
+def make_connector(documents):
+    connector = OptimizedMongoConnector(db_name='test', cache_enabled=True)
+    collection = FakeCollection(documents)
+    connector.ensure_connection = lambda: True
+    connector.db = {'kolekcja': collection}
+    return connector, collection
+
+
+def test_key_does_not_depend_on_filter_order():
+    assert (ReadThroughCache.make_key('k', {'a': 1, 'b': 2})
+            == ReadThroughCache.make_key('k', {'b': 2, 'a': 1}))
+    assert (ReadThroughCache.make_key('k', {'a': 1})
+            != ReadThroughCache.make_key('k', {'a': 1}, kind='many'))
+    # Kolejność pól w zagnieżdżonym dokumencie zmienia zapytanie w MongoDB
+    assert (ReadThroughCache.make_key('k', {'a': {'x': 1, 'y': 2}})
+            != ReadThroughCache.make_key('k', {'a': {'y': 2, 'x': 1}}))
+
+
+def test_cached_none_is_a_hit():
+    cache = ReadThroughCache()
+
+    assert cache.get(('k',)) is _MISSING
+    cache.put(('k',), None)
+
+    assert cache.get(('k',)) is None
+    assert cache.stats()['hits'] == 1
+    assert cache.stats()['misses'] == 1
+
+
+def test_values_are_copied():
+    cache = ReadThroughCache()
+    value = {'dane': [1, 2]}
+    cache.put(('k',), value)
+
+    value['dane'].append(3)
+    cache.get(('k',))['dane'].append(4)
+
+    assert cache.get(('k',)) == {'dane': [1, 2]}
+
+
+def test_lru_eviction():
+    cache = ReadThroughCache(max_entries=2)
+    cache.put(('a',), 1)
+    cache.put(('b',), 2)
+    cache.get(('a',))
+    cache.put(('c',), 3)
+
+    assert cache.get(('b',)) is _MISSING
+    assert cache.get(('a',)) == 1
+    assert cache.get(('c',)) == 3
+    assert cache.stats()['evictions'] == 1
+
+
+def test_ttl_expiry(clock):
+    cache = ReadThroughCache(ttl_seconds=10)
+    cache.put(('a',), {'x': 1})
+
+    clock.now += 9
+    assert cache.get(('a',)) == {'x': 1}
+    clock.now += 1
+    assert cache.get(('a',)) is _MISSING
+
+    stats = cache.stats()
+    assert stats['expirations'] == 1
+    assert stats['entries'] == 0
+    assert stats['bytes'] == 0
+
+
+def test_byte_budget_eviction():
+    document = {'dane': 'x' * 100}
+    size = ReadThroughCache.estimate_size(document)
+    cache = ReadThroughCache(max_bytes=2 * size)
+
+    for name in ('a', 'b', 'c'):
+        cache.put((name,), document)
+
+    assert cache.get(('a',)) is _MISSING
+    assert cache.stats()['bytes'] == 2 * size
+
+    # Wynik większy niż cały budżet nie trafia do cache
+    cache.put(('big',), {'dane': 'x' * 1000})
+    assert cache.get(('big',)) is _MISSING
+    assert cache.stats()['entries'] == 2
+
+
+def test_connector_hit_skips_database():
+    connector, collection = make_connector([{'dataCet': 1, 'wartosc': 'a'}])
+
+    assert connector.find_document('kolekcja', {'dataCet': 1})['wartosc'] == 'a'
+    assert connector.find_document('kolekcja', {'dataCet': 1})['wartosc'] == 'a'
+    assert connector.find_documents('kolekcja', {}) == connector.find_documents('kolekcja', {})
+
+    assert collection.queries == 2
+    assert connector.cache_stats()['hits'] == 2
+
+
+@pytest.mark.parametrize('write', [
+    lambda c: c.insert_document('kolekcja', {'dataCet': 2, 'wartosc': 'b'}),
+    lambda c: c.update_document('kolekcja', {'dataCet': 1}, {'$set': {'wartosc': 'b'}}),
+    lambda c: c.delete_documents_older_than_days('kolekcja'),
+])
+def test_writes_invalidate_collection(write):
+    connector, collection = make_connector([{'dataCet': 1, 'wartosc': 'a'}])
+    before = connector.find_documents('kolekcja', {})
+
+    assert write(connector)
+    after = connector.find_documents('kolekcja', {})
+
+    assert collection.queries == 2
+    assert after != before
+    assert connector.cache_stats()['invalidations'] == 1
+
+
+def test_cache_disabled_by_default():
+    assert OptimizedMongoConnector(db_name='test').cache_stats() is None
+
+
+def test_result_read_before_concurrent_write_is_not_cached():
+    connector, collection = make_connector([{'dataCet': 1, 'wartosc': 'a'}])
+    find = collection.find
+
+    def find_then_write(filtr, projection=None):
+        # Zapis z innego wątku między zapytaniem a zapisem wyniku do cache
+        result = find(filtr, projection)
+        collection.find = find
+        connector.insert_document('kolekcja', {'dataCet': 2, 'wartosc': 'b'})
+        return result
+
+    collection.find = find_then_write
+    assert len(connector.find_documents('kolekcja', {})) == 1
+
+    assert len(connector.find_documents('kolekcja', {})) == 2
+    assert collection.queries == 2
+
+
+def test_put_with_old_generation_is_skipped():
+    cache = ReadThroughCache()
+    generation = cache.generation('k')
+    cache.invalidate_collection('k')
+    cache.put(('k', 'one'), {'x': 1}, generation)
+    assert cache.get(('k', 'one')) is _MISSING
+
+    generation = cache.generation('k')
+    cache.clear()
+    cache.put(('k', 'one'), {'x': 1}, generation)
+    assert cache.get(('k', 'one')) is _MISSING
+
+    cache.put(('k', 'one'), {'x': 1}, cache.generation('k'))
+    assert cache.get(('k', 'one')) == {'x': 1}
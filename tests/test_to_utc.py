@@ -0,0 +1,39 @@
+"""
+Testy konwersji czasu lokalnego Europe/Warsaw na UTC przy zmianach czasu
+"""
+
+import datetime
+
+import pytest
+
+from processor.data_processor import to_utc
+
+
+UTC = datetime.timezone.utc
+
+
+@pytest.mark.parametrize('local, expected', [
+    # Zwykłe dni: CET +01:00 zimą, CEST +02:00 latem
+    ((2025, 1, 15, 12), (2025, 1, 15, 11)),
+    ((2025, 6, 1, 12), (2025, 6, 1, 10)),
+    # Zmiana na czas letni - 02:00 nie istnieje, jak pytz is_dst=False (+01:00)
+    ((2025, 3, 30, 2), (2025, 3, 30, 1)),
+    ((2025, 3, 30, 3), (2025, 3, 30, 1)),
+    # Zmiana na czas zimowy - 02:00 występuje dwa razy, domyślnie czas zimowy
+    ((2025, 10, 26, 2), (2025, 10, 26, 1)),
+    ((2025, 10, 26, 3), (2025, 10, 26, 2)),
+    ((2024, 10, 27, 2), (2024, 10, 27, 1)),
+])
+def test_to_utc_matches_pytz_is_dst_false(local, expected):
+    result = to_utc(datetime.datetime(*local))
+
+    assert result == datetime.datetime(*expected, tzinfo=UTC)
+    assert result.tzinfo is UTC
+
+
+def test_first_occurrence_of_repeated_hour_is_summer_time():
+    assert to_utc(datetime.datetime(2025, 10, 26, 2), first_occurrence=True) == \
+        datetime.datetime(2025, 10, 26, 0, tzinfo=UTC)
+    # Poza godziną niejednoznaczną first_occurrence nic nie zmienia
+    assert to_utc(datetime.datetime(2025, 3, 30, 2), first_occurrence=True) == \
+        datetime.datetime(2025, 3, 30, 1, tzinfo=UTC)
@@ -0,0 +1,208 @@
+"""
+Testy walidacji doby (DayValidator) na danych przetworzonych przez OptimizedDataProcessor
+"""
+
+import datetime
+import json
+import os
+
+import pytest
+
+from loadtest.pse_stub_server import build_csv
+from processor.data_processor import OptimizedDataProcessor
+from processor.validator import DayValidator
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.json')
+
+with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+    FEED = json.load(f)['pobierz']['file_2']
+
+UTC = datetime.timezone.utc
+
+
+def make_processor(date_string: str, **kwargs) -> OptimizedDataProcessor:
+    return OptimizedDataProcessor(
+        url_template=FEED['url_template'],
+        data_start=date_string,
+        int_cols=FEED['int_cols'],
+        float_cols=FEED['float_cols'],
+        date_cols=FEED['date_cols'],
+        fields_to_utc=FEED['fields_to_utc'],
+        fields_to_add_hour=FEED['fields_to_add_hour'],
+        date_format=FEED['date_format'],
+        **kwargs
+    )
+
+
+def process(date_string: str, content: bytes):
+    processor = make_processor(date_string)
+    rows = processor.process_csv_content(content)
+    return processor, rows
+
+
+@pytest.mark.parametrize('date_string, interval_minutes, expected_rows', [
+    ('2025-10-26', 60, 25),
+    ('2025-10-26', 15, 100),
+    ('2025-03-30', 60, 23),
+    ('2025-03-30', 15, 92),
+    ('2025-06-01', 60, 24),
+])
+def test_dst_days_are_complete(date_string, interval_minutes, expected_rows):
+    processor, rows = process(date_string, build_csv(date_string.replace('-', ''), interval_minutes))
+
+    report = processor.validate_day(rows)
+
+    assert report.complete, report.errors
+    assert report.stats['expected_intervals'] == expected_rows
+    assert len(rows) == expected_rows
+
+
+def test_fall_back_hours_map_to_distinct_timestamps():
+    _, rows = process('2025-10-26', build_csv('20251026', 60))
+    by_label = dict(zip(['1', '2', '3', '2A', '4'], rows[:5]))
+
+    # '3' to pierwsze wystąpienie 02:00 (CEST), '2A' - drugie (CET)
+    assert by_label['3']['Data'] == datetime.datetime(2025, 10, 26, 0, 0, tzinfo=UTC)
+    assert by_label['2A']['Data'] == datetime.datetime(2025, 10, 26, 1, 0, tzinfo=UTC)
+    assert by_label['4']['Data'] == datetime.datetime(2025, 10, 26, 2, 0, tzinfo=UTC)
+    assert len({row['Data'] for row in rows}) == 25
+
+
+def test_spring_forward_day_skips_missing_hour():
+    _, rows = process('2025-03-30', build_csv('20250330', 60))
+
+    assert rows[1]['Data'] == datetime.datetime(2025, 3, 30, 0, 0, tzinfo=UTC)
+    assert rows[2]['Data'] == datetime.datetime(2025, 3, 30, 1, 0, tzinfo=UTC)
+    assert len({row['Data'] for row in rows}) == 23
+
+
+def test_duplicate_timestamp_is_an_error():
+    # Dwie różne etykiety trafiające w tę samą godzinę: '03:00-04:00' i '4'
+    content = build_csv('20251026', 60).replace(b';5;', b';03:00-04:00;', 1)
+    processor, rows = process('2025-10-26', content)
+
+    report = processor.validate_day(rows)
+
+    assert not report.complete
+    assert any('znaczników czasu' in error for error in report.errors)
+
+
+def test_truncated_day_is_incomplete():
+    lines = build_csv('20251026', 15).split(b'\r\n')
+    processor, rows = process('2025-10-26', b'\r\n'.join(lines[:40]))
+
+    report = processor.validate_day(rows)
+
+    assert not report.complete
+    assert any('liczba interwałów 39 zamiast 100' in error for error in report.errors)
+
+
+def test_absent_column_is_an_error():
+    # Nagłówek zepsuty przez złe kodowanie - kolumny nie ma w żadnym wierszu
+    content = build_csv('20250601', 60).replace('Słowacja_EXP'.encode('windows-1250'), b'S?owacja_EXP')
+    processor, rows = process('2025-06-01', content)
+
+    report = processor.validate_day(rows)
+
+    assert not report.complete
+    assert any('Slowacja_EXP' in error and 'brak kolumn' in error for error in report.errors)
+
+
+def test_column_with_only_dashes_is_a_warning():
+    validator = DayValidator(value_columns=['A_EXP', 'B_IMP'])
+    rows = [{'Data': datetime.datetime(2025, 6, 1, hour, tzinfo=UTC), 'Godzina': hour,
+             'A_EXP': 1.0, 'B_IMP': None} for hour in range(24)]
+
+    report = validator.validate('2025-06-02', rows, [str(hour + 1) for hour in range(24)])
+
+    assert report.complete, report.errors
+    assert report.warnings == ['kolumny bez danych: B_IMP']
+
+
+def test_out_of_range_and_missing_ratio():
+    validator = DayValidator(value_columns=['A_EXP', 'B_IMP'], max_value=100, max_missing_ratio=0.4)
+    rows = [{'Data': datetime.datetime(2025, 6, 1, hour, tzinfo=UTC), 'Godzina': hour,
+             'A_EXP': 500.0 if hour == 5 else None, 'B_IMP': 1.0} for hour in range(24)]
+
+    report = validator.validate('2025-06-02', rows, [str(hour + 1) for hour in range(24)])
+
+    assert not report.complete
+    assert any('poza zakresem' in error and 'A_EXP' in error for error in report.errors)
+    assert any('udział braków' in error for error in report.errors)
+
+
+def test_rejected_rows_are_an_error():
+    validator = DayValidator(value_columns=['A_EXP'])
+    rows = [{'Data': datetime.datetime(2025, 6, 1, hour, tzinfo=UTC), 'Godzina': hour, 'A_EXP': 1.0}
+            for hour in range(24)]
+
+    report = validator.validate('2025-06-02', rows, [str(hour + 1) for hour in range(24)],
+                                rejected_rows=1)
+
+    assert not report.complete
+
+
+class FakeDownloader:
+    """Zwraca kolejne wersje pliku przy każdym pobraniu."""
+
+    def __init__(self, contents):
+        self.contents = list(contents)
+        self.init_kwargs = None
+        self.downloads = 0
+        self.waits = []
+
+    def __call__(self, url_template, data_start, **kwargs):
+        self.init_kwargs = kwargs
+        return self
+
+    def download(self):
+        self.downloads += 1
+        return self.contents.pop(0)
+
+    def wait_before_retry(self, attempt):
+        self.waits.append(attempt)
+
+
+def run_process_and_save(monkeypatch, contents, **kwargs):
+    from downloader import file_downloader
+
+    downloader = FakeDownloader(contents)
+    monkeypatch.setattr(file_downloader, 'OptimizedFileDownloader', downloader)
+    processor = make_processor('2025-06-01', **kwargs)
+    saved = []
+    processor.save_to_mongo = lambda data: saved.append(data) or True
+    return processor.process_and_save(), downloader, saved
+
+
+def test_header_only_file_is_repolled(monkeypatch):
+    full = build_csv('20250601', 60)
+    header_only = full.split(b'\r\n')[0] + b'\r\n'
+
+    success, downloader, saved = run_process_and_save(monkeypatch, [header_only, full])
+
+    assert success
+    assert downloader.waits == [1]
+    assert len(saved[0]) == 24
+
+
+def test_repoll_limit_is_separate_from_http_retries(monkeypatch):
+    truncated = b'\r\n'.join(build_csv('20250601', 60).split(b'\r\n')[:10])
+
+    success, downloader, saved = run_process_and_save(
+        monkeypatch, [truncated] * 3, max_retries=18, validation={'max_repolls': 3})
+
+    assert not success
+    assert not saved
+    assert downloader.downloads == 3
+    assert downloader.init_kwargs == {'max_retries': 18}
+
+
+def test_single_poll_gives_up_on_empty_file(monkeypatch):
+    header_only = build_csv('20250601', 60).split(b'\r\n')[0] + b'\r\n'
+
+    success, downloader, saved = run_process_and_save(monkeypatch, [header_only], max_repolls=1)
+
+    assert not success
+    assert not saved
+    assert downloader.waits == []